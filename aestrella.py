@@ -4,6 +4,8 @@ from mesa.time import BaseScheduler
 import time
 import json
 import heapq
+from escenarios import OccupancyGrid
+import cache
 
 
 def manhattan(a, b):
@@ -11,14 +13,27 @@ def manhattan(a, b):
 
  # algoritmo A*
 def astar(start, goal, blocked, width, height):
-    def neighbors(p):
-        x, y = p
-        cand = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
-        valid = []
-        for nx, ny in cand:
-            if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in blocked:
-                valid.append((nx, ny))
-        return valid
+    if isinstance(blocked, OccupancyGrid):
+        # acceso directo al bytearray: evita una llamada a __contains__ por vecino
+        cells = blocked.cells
+
+        def neighbors(p):
+            x, y = p
+            cand = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
+            valid = []
+            for nx, ny in cand:
+                if 0 <= nx < width and 0 <= ny < height and not cells[ny * width + nx]:
+                    valid.append((nx, ny))
+            return valid
+    else:
+        def neighbors(p):
+            x, y = p
+            cand = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
+            valid = []
+            for nx, ny in cand:
+                if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in blocked:
+                    valid.append((nx, ny))
+            return valid
 
     open_heap = []
     heapq.heappush(open_heap, (0, start))
@@ -60,7 +75,15 @@ class WalleAStar(Agent):
         self.i = 0
 
     def plan(self):
-        self.path = astar(self.pos, self.goal, self.model.blocked, self.model.width, self.model.height)
+        m = self.model
+        # sin cache no vale la pena hashear el mapa
+        key = cache.scenario_key(m.width, m.height, self.pos, self.goal, m.blocked, "astar") \
+            if cache.ENABLED else None
+        found, path = cache.get_path(key)
+        if not found:
+            path = astar(self.pos, self.goal, m.blocked, m.width, m.height)
+            cache.put_path(key, path)
+        self.path = path
         self.i = 0
 
     def step(self):
@@ -87,9 +110,15 @@ class GridWorld(Model):
 
         self.start = start
         self.goal = goal
-        self.blocked = set(obstacles) if obstacles else set()
-        self.blocked.discard(self.start)
-        self.blocked.discard(self.goal)
+        # un OccupancyGrid (mapas grandes) se copia tal cual en vez de pasar a set
+        if isinstance(obstacles, OccupancyGrid):
+            self.blocked = obstacles.copy()
+            self.blocked.free(*self.start)
+            self.blocked.free(*self.goal)
+        else:
+            self.blocked = set(obstacles) if obstacles else set()
+            self.blocked.discard(self.start)
+            self.blocked.discard(self.goal)
 
         self.walle = WalleAStar(1, self, self.goal)
         self.grid.place_agent(self.walle, self.start)
@@ -97,6 +126,11 @@ class GridWorld(Model):
 
         self.step_count = 0
 
+    @classmethod
+    def from_scenario(cls, scenario):
+        return cls(width=scenario.width, height=scenario.height, start=scenario.start,
+                   goal=scenario.goal, obstacles=scenario.grid)
+
     def at_goal(self):
         return self.walle.pos == self.goal
 
@@ -106,7 +140,9 @@ def print_grid(model):
     g = model.goal
 
     print(f"\npaso {model.step_count}, posición: ({w[0]+1},{w[1]+1}), meta: ({g[0]+1},{g[1]+1})")
-    for y in reversed(range(model.height)):
+    # los mapas MovingAI cuentan y desde arriba, el resto desde abajo
+    rows = range(model.height) if getattr(model.blocked, "y_down", False) else reversed(range(model.height))
+    for y in rows:
         row = []
         for x in range(model.width):
             p = (x, y)
@@ -0,0 +1,206 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+import numpy as np
+
+# cache de resultados indexado por el hash del mapa y los parámetros:
+# - LRU en memoria para caminos de A* y políticas de Q-Learning
+# - almacén en disco (.npz) para Q-tables entrenadas, con límite de tamaño
+
+CACHE_DIR = os.path.join(".cache", "qtables")
+MAX_DISK_BYTES = 64 * 1024 * 1024  # 64 MB
+MAX_MEMORY_BYTES = 64 * 1024 * 1024  # 64 MB para las Q-tables en memoria
+ENABLED = True
+
+# subir al cambiar recompensas, regla de actualización o formato: las
+# Q-tables en disco con otra versión dejan de coincidir con la llave
+CACHE_VERSION = 1
+
+_MISS = object()
+
+
+def scenario_key(width, height, start, goal, obstacles, params=None):
+    """Hash sha256 de (ancho, alto, inicio, meta, obstáculos, parámetros).
+
+    `obstacles` puede ser un set de (x, y) o un OccupancyGrid; en ambos
+    casos se hashea la ocupación celda por celda para que el mismo mapa
+    dé la misma llave sin importar cómo se construyó.
+    """
+    cells = getattr(obstacles, "cells", None)
+    if cells is None or getattr(obstacles, "width", None) != width:
+        cells = bytearray(width * height)
+        for x, y in obstacles or ():
+            if 0 <= x < width and 0 <= y < height:
+                cells[y * width + x] = 1
+
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}|{width}x{height}|{tuple(start)}|{tuple(goal)}|{params!r}|".encode())
+    h.update(cells)
+    return h.hexdigest()
+
+
+def ql_params_key(params, impl):
+    """Parámetros de QL_Params que afectan el entrenamiento.
+
+    `impl` distingue las implementaciones de WalleQLearner (qlearning.py y
+    experimento.py) para que no compartan Q-tables.
+    """
+    return (impl, params.ALPHA, params.GAMMA, params.EPSILON, params.EPISODES, params.MAX_STEPS)
+
+
+def q_table_bytes(q_table):
+    """Tamaño aproximado en memoria de una Q-table {(x, y): np.array}."""
+    return sys.getsizeof(q_table) + sum(sys.getsizeof(v) + sys.getsizeof(s)
+                                        for s, v in q_table.items())
+
+
+class LRUCache:
+    """Diccionario acotado que descarta el elemento usado hace más tiempo.
+
+    Se limita por cantidad de elementos y, si se da `maxbytes`, también por
+    el tamaño total según `sizeof`.
+    """
+
+    def __init__(self, maxsize=256, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.data = OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self.data:
+            self._remove(key)
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            return  # no cabe ni sola, no vale la pena desalojar todo
+        self.data[key] = value
+        self.sizes[key] = size
+        self.nbytes += size
+        while len(self.data) > self.maxsize or \
+                (self.maxbytes is not None and self.nbytes > self.maxbytes):
+            self._remove(next(iter(self.data)))
+
+    def _remove(self, key):
+        del self.data[key]
+        self.nbytes -= self.sizes.pop(key)
+
+    def clear(self):
+        self.data.clear()
+        self.sizes.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.data)
+
+
+class DiskStore:
+    """Q-tables en disco, un .npz por llave.
+
+    Cuando el directorio supera `max_bytes` se borran los archivos con
+    acceso más antiguo (mtime se actualiza en cada lectura).
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_DISK_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                states, values = data["states"], data["values"]
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(path)
+        return {(int(x), int(y)): values[i].copy() for i, (x, y) in enumerate(states)}
+
+    def put(self, key, q_table):
+        os.makedirs(self.directory, exist_ok=True)
+        states = np.array(list(q_table.keys()), dtype=np.int32).reshape(-1, 2)
+        values = np.array(list(q_table.values()), dtype=np.float64)
+
+        # se escribe a un temporal y se renombra para no dejar archivos a medias
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, states=states, values=values)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            st = os.stat(os.path.join(self.directory, name))
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+
+# instancias compartidas por aestrella.py, qlearning.py y experimento.py
+paths = LRUCache(1024)
+policies = LRUCache(64, maxbytes=MAX_MEMORY_BYTES, sizeof=q_table_bytes)
+q_store = DiskStore()
+
+
+def get_path(key):
+    """Retorna (encontrado, camino); el camino puede ser None si no hay ruta."""
+    if not ENABLED:
+        return False, None
+    path = paths.get(key, _MISS)
+    if path is _MISS:
+        return False, None
+    return True, (list(path) if path is not None else None)
+
+
+def put_path(key, path):
+    if ENABLED:
+        paths.put(key, tuple(path) if path is not None else None)
+
+
+def get_q_table(key):
+    """Busca la Q-table primero en memoria y luego en disco."""
+    if not ENABLED:
+        return None
+    q_table = policies.get(key)
+    if q_table is None:
+        q_table = q_store.get(key)
+        if q_table is None:
+            return None
+        policies.put(key, q_table)
+    # copia para que el agente pueda seguir actualizándola sin tocar la cache
+    return {s: v.copy() for s, v in q_table.items()}
+
+
+def put_q_table(key, q_table):
+    if not ENABLED:
+        return
+    q_table = {s: np.asarray(v, dtype=np.float64).copy() for s, v in q_table.items()}
+    policies.put(key, q_table)
+    q_store.put(key, q_table)
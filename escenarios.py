@@ -0,0 +1,201 @@
+import json
+import os
+
+# carga de escenarios: mapas MovingAI (.map/.scen) y archivos JSONL
+# todo se lee línea por línea para no cargar archivos enormes en memoria
+
+# celdas transitables en formato MovingAI ('.' libre, 'G' pasto, 'S' pantano)
+PASSABLE = frozenset(".GS")
+
+
+class OccupancyGrid:
+    """Grid compacto de ocupación: un byte por celda (1 = obstáculo).
+
+    Se comporta como el set `blocked` que usan astar y GridWorld:
+    `(x, y) in grid` indica si la celda está bloqueada e iterarlo
+    da las celdas bloqueadas. `y_down` indica que la fila 0 es la de
+    arriba (convención MovingAI); en el resto del repo y crece hacia arriba.
+    """
+
+    __slots__ = ("width", "height", "cells", "y_down")
+
+    def __init__(self, width, height, cells=None, y_down=False):
+        self.width = width
+        self.height = height
+        self.cells = cells if cells is not None else bytearray(width * height)
+        self.y_down = y_down
+
+    def __contains__(self, p):
+        x, y = p
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x] == 1
+        return False
+
+    def __iter__(self):
+        w = self.width
+        for i, c in enumerate(self.cells):
+            if c:
+                yield (i % w, i // w)
+
+    def __len__(self):
+        return self.cells.count(1)
+
+    def _index(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"celda ({x}, {y}) fuera del grid {self.width}x{self.height}")
+        return y * self.width + x
+
+    def block(self, x, y):
+        self.cells[self._index(x, y)] = 1
+
+    def free(self, x, y):
+        self.cells[self._index(x, y)] = 0
+
+    def copy(self):
+        return OccupancyGrid(self.width, self.height, bytearray(self.cells), self.y_down)
+
+    @classmethod
+    def from_obstacles(cls, width, height, obstacles):
+        grid = cls(width, height)
+        for x, y in obstacles:
+            grid.block(x, y)
+        return grid
+
+
+class Scenario:
+    """Una consulta de planeación: mapa + inicio + meta."""
+
+    __slots__ = ("grid", "start", "goal", "optimal", "name")
+
+    def __init__(self, grid, start, goal, optimal=None, name=""):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.optimal = optimal  # longitud óptima publicada (si existe)
+        self.name = name
+
+    @property
+    def width(self):
+        return self.grid.width
+
+    @property
+    def height(self):
+        return self.grid.height
+
+
+def check_endpoints(grid, start, goal, where):
+    """Verifica que inicio y meta estén dentro del grid."""
+    for name, (x, y) in (("inicio", start), ("meta", goal)):
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            raise ValueError(f"{where}: {name} ({x}, {y}) fuera del grid {grid.width}x{grid.height}")
+
+
+# MovingAI
+
+def load_movingai_map(path):
+    """Lee un archivo .map de MovingAI y retorna un OccupancyGrid.
+
+    Se conserva la convención del benchmark: x = columna, y = fila
+    contada desde arriba.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        header = {}
+        for line in f:
+            line = line.strip()
+            if line == "map":
+                break
+            key, _, value = line.partition(" ")
+            header[key] = value.strip()
+        else:
+            raise ValueError(f"{path}: falta la línea 'map'")
+
+        width = int(header["width"])
+        height = int(header["height"])
+        grid = OccupancyGrid(width, height, y_down=True)
+        cells = grid.cells
+
+        # tabla de traducción: 0 si es transitable, 1 si no
+        table = bytes(0 if chr(i) in PASSABLE else 1 for i in range(256))
+        y = 0
+        for line in f:
+            row = line.rstrip("\r\n")
+            if not row:
+                continue
+            if y >= height or len(row) != width:
+                raise ValueError(f"{path}: fila {y} no coincide con {width}x{height}")
+            cells[y * width:(y + 1) * width] = row.encode("latin-1").translate(table)
+            y += 1
+
+    if y != height:
+        raise ValueError(f"{path}: se esperaban {height} filas, se leyeron {y}")
+    return grid
+
+
+def iter_movingai_scen(path, map_dir=None, limit=None):
+    """Genera los escenarios de un archivo .scen de MovingAI, uno a la vez.
+
+    Cada mapa referenciado se carga una sola vez. `map_dir` es la carpeta
+    de los .map (por defecto la misma del .scen). Nota: los benchmarks
+    publicados son 8-conectados; aquí astar solo usa 4 vecinos, así que
+    `optimal` sirve como referencia, no como valor esperado.
+    """
+    if map_dir is None:
+        map_dir = os.path.dirname(path)
+    maps = {}
+    count = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            parts = line.split("\t") if "\t" in line else line.split()
+            if len(parts) < 9 or parts[0] == "version":
+                continue
+            if limit is not None and count >= limit:
+                return
+
+            map_name = parts[1].strip()
+            grid = maps.get(map_name)
+            if grid is None:
+                grid = load_movingai_map(os.path.join(map_dir, os.path.basename(map_name)))
+                maps[map_name] = grid
+
+            start = (int(parts[4]), int(parts[5]))
+            goal = (int(parts[6]), int(parts[7]))
+            check_endpoints(grid, start, goal, f"{path}:{lineno}")
+            yield Scenario(grid, start, goal, float(parts[8]), f"{map_name}#{count}")
+            count += 1
+
+
+# JSONL (mismo formato que export_json, un escenario por línea)
+
+def iter_jsonl_scenarios(path, limit=None):
+    """Genera escenarios desde un archivo JSONL, uno por línea."""
+    count = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if limit is not None and count >= limit:
+                return
+
+            data = json.loads(line)
+            start, goal = tuple(data["start"]), tuple(data["goal"])
+            try:
+                grid = OccupancyGrid.from_obstacles(
+                    data["width"], data["height"], data.get("obstacles") or [])
+            except ValueError as e:
+                raise ValueError(f"{path}:{lineno}: {e}") from None
+            check_endpoints(grid, start, goal, f"{path}:{lineno}")
+            yield Scenario(grid, start, goal,
+                           data.get("optimal"), data.get("name", f"{path}#{count}"))
+            count += 1
+
+
+def iter_scenarios(path, limit=None):
+    """Elige el lector según la extensión (.scen o .jsonl)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".scen":
+        return iter_movingai_scen(path, limit=limit)
+    if ext == ".jsonl":
+        return iter_jsonl_scenarios(path, limit=limit)
+    raise ValueError(f"formato de escenario no soportado: {path}")
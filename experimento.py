@@ -3,9 +3,13 @@ import random
 import time
 import heapq
 import csv
+import argparse
 from mesa import Agent, Model
 from mesa.space import MultiGrid
 from mesa.time import BaseScheduler
+from escenarios import OccupancyGrid, iter_scenarios
+from perfil import Profiler
+import cache
 
 # configuración global
 WIDTH = 11
@@ -20,26 +24,42 @@ DENSITIES = [0.1, 0.3, 0.5] # 10%, 30%, 50% de obstáculos
 def manhattan(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def astar_search(start, goal, blocked, width, height):
-    """Retorna la lista de pasos (camino) o None si no hay camino."""
-    def neighbors(p):
-        x, y = p
-        cand = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
-        valid = []
-        for nx, ny in cand:
-            if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in blocked:
-                valid.append((nx, ny))
-        return valid
+def astar_search(start, goal, blocked, width, height, stats=None):
+    """Retorna la lista de pasos (camino) o None si no hay camino.
+    Si se pasa `stats` (dict), guarda ahí los nodos expandidos."""
+    if isinstance(blocked, OccupancyGrid):
+        # acceso directo al bytearray: evita una llamada a __contains__ por vecino
+        cells = blocked.cells
+
+        def neighbors(p):
+            x, y = p
+            cand = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
+            valid = []
+            for nx, ny in cand:
+                if 0 <= nx < width and 0 <= ny < height and not cells[ny * width + nx]:
+                    valid.append((nx, ny))
+            return valid
+    else:
+        def neighbors(p):
+            x, y = p
+            cand = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
+            valid = []
+            for nx, ny in cand:
+                if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in blocked:
+                    valid.append((nx, ny))
+            return valid
 
     open_heap = []
     heapq.heappush(open_heap, (0, start))
     came_from = {}
     g_score = {start: 0}
     in_open = {start}
+    expanded = 0
 
     while open_heap:
         _, current = heapq.heappop(open_heap)
         in_open.discard(current)
+        expanded += 1
 
         if current == goal:
             path = [current]
@@ -47,6 +67,8 @@ def astar_search(start, goal, blocked, width, height):
                 current = came_from[current]
                 path.append(current)
             path.reverse()
+            if stats is not None:
+                stats["expandidos"] = expanded
             return path
 
         for nb in neighbors(current):
@@ -58,6 +80,8 @@ def astar_search(start, goal, blocked, width, height):
                 if nb not in in_open:
                     heapq.heappush(open_heap, (f, nb))
                     in_open.add(nb)
+    if stats is not None:
+        stats["expandidos"] = expanded
     return None
 
 
@@ -79,6 +103,7 @@ class WalleQLearner(Agent):
         self.start_pos = start
         self.goal_pos = goal
         self.q_table = {} 
+        self.from_cache = False
 
     def get_q(self, state):
         if state not in self.q_table:
@@ -94,9 +119,25 @@ class WalleQLearner(Agent):
             best_actions = [i for i, val in enumerate(q_values) if val == max_val]
             return random.choice(best_actions)
 
-    def train(self):
-        """Entrena al agente y retorna cuánto tardó."""
+    def train(self, stats=None, use_cache=True):
+        """Entrena al agente y retorna cuánto tardó (0 si salió de la cache).
+        Si se pasa `stats` (dict), guarda visitas y tamaño de la Q-table."""
+        # la llave y la búsqueda van fuera del tiempo medido
+        use_cache = use_cache and cache.ENABLED
+        if use_cache:
+            key = cache.scenario_key(self.model.width, self.model.height, self.start_pos,
+                                     self.goal_pos, self.model.blocked, cache.ql_params_key(QL_Params, "experimento"))
+            cached = cache.get_q_table(key)
+            if cached is not None:
+                # mismo mapa y parámetros: no se vuelve a entrenar
+                self.q_table = cached
+                self.from_cache = True
+                if stats is not None:
+                    self.table_stats(stats, 0)
+                return 0.0
+
         start_time = time.time()
+        visits = 0
         for _ in range(QL_Params.EPISODES):
             state = self.start_pos
             done = False
@@ -128,9 +169,19 @@ class WalleQLearner(Agent):
                 
                 state = next_state
                 steps += 1
+            visits += steps
         end_time = time.time()
+        if use_cache:
+            cache.put_q_table(key, self.q_table)
+        if stats is not None:
+            self.table_stats(stats, visits)
         return end_time - start_time
 
+    def table_stats(self, stats, visits):
+        stats["visitas"] = visits
+        stats["q_estados"] = len(self.q_table)
+        stats["q_bytes"] = sum(v.nbytes for v in self.q_table.values())
+
     def run_policy(self):
         """Ejecuta la ruta aprendida y retorna (éxito, pasos)."""
         state = self.start_pos
@@ -160,7 +211,8 @@ class GridWorldQL(Model):
         super().__init__()
         self.width = width
         self.height = height
-        self.blocked = set(obstacles)
+        # OccupancyGrid ya responde `in` en O(1), no hace falta convertirlo
+        self.blocked = obstacles if isinstance(obstacles, OccupancyGrid) else set(obstacles)
         self.walle = WalleQLearner(1, self, start, goal)
 
 # se genera el mapa y el experimiento
@@ -181,69 +233,160 @@ def generate_obstacles(density):
         
     return set(random.sample(possible_locs, num_obstacles))
 
-def run_experiment():
+def random_maps():
+    """mapas aleatorios: (mapID, densidad, ancho, alto, inicio, meta, obstáculos)"""
+    for density in DENSITIES:
+        for i in range(NUM_MAPS):
+            yield i, density, WIDTH, HEIGHT, START, GOAL, generate_obstacles(density)
+
+def scenario_maps(scenarios):
+    """adapta escenarios cargados (ver escenarios.py) al mismo formato"""
+    last_grid = None
+    density = None
+    for sc in scenarios:
+        grid = sc.grid
+        # los .scen repiten el mismo mapa seguido, la densidad se recalcula
+        # solo cuando cambia el grid
+        if grid is not last_grid:
+            density = round(len(grid) / (grid.width * grid.height), 3)
+            last_grid = grid
+        yield sc.name, density, grid.width, grid.height, sc.start, sc.goal, grid
+
+def run_experiment(scenarios=None, csv_file="resultados_experimento.csv",
+                   profile=False, cprofile_dir=None, use_cache=True):
+    """corre A* y Q-Learning sobre mapas aleatorios o sobre `scenarios`
+    (cualquier iterable de escenarios.Scenario, se consume en streaming).
+    con `profile` se agregan al csv memoria pico, bloques vivos, nodos
+    expandidos, visitas y tamaño de la Q-table; con `cprofile_dir` además
+    se guarda un .prof por algoritmo y densidad. memoria, bloques y .prof
+    salen de una segunda corrida bajo tracemalloc que repite el mismo
+    estado de `random`, así describen la misma ejecución que el resto de
+    la fila. `bloques_netos` es el cambio en bloques vivos (lo que queda
+    retenido), no la cantidad de asignaciones hechas. con `use_cache=False` se
+    ignora la cache y todo se recalcula (el perfil siempre la ignora, si no
+    los contadores saldrían en cero).
+    en los resultados servidos por la cache `tiempo` queda vacío, para no
+    mezclar búsquedas con tiempos reales."""
     results = []
-    
-    print(f"iniciando experimento ({len(DENSITIES) * NUM_MAPS} escenarios)...")
+    profiler = Profiler(profile, cprofile_dir)
+    use_cache = use_cache and cache.ENABLED and not profiler.enabled
+
+    if scenarios is None:
+        maps = random_maps()
+        print(f"iniciando experimento ({len(DENSITIES) * NUM_MAPS} escenarios)...")
+    else:
+        maps = scenario_maps(scenarios)
+        print("iniciando experimento (escenarios cargados)...")
     print("------------------------------------------------------------")
     print(f"{'densidad':<10} | {'algoritmo':<10} | {'exito':<6} | {'pasos':<6} | {'tiempo':<10}")
     print("------------------------------------------------------------")
 
-    for density in DENSITIES:
-        for i in range(NUM_MAPS):
-            # genera el mapa
-            obstacles = generate_obstacles(density)
-            
-            # prueba A*
-            t0 = time.time()
-            path = astar_search(START, GOAL, obstacles, WIDTH, HEIGHT)
-            t1 = time.time()
-            
-            astar_time = t1 - t0
-            astar_success = path is not None
-            # se resta 1 porque el path incluye el start
-            astar_steps = (len(path) - 1) if path else 0 
-            
-            results.append({
-                "mapID": i,
-                "densidad": density,
-                "algoritmo": "A*",
-                "exito": astar_success,
-                "pasos": astar_steps,
-                "tiempo": round(astar_time, 5)
-            })
-            print(f"{density:<10} | {'A*':<10} | {str(astar_success):<6} | {astar_steps:<6} | {astar_time:.5f}")
-
-            # pureba Q-Learning
-            # se instancia el modelo nuevo
-            model_ql = GridWorldQL(WIDTH, HEIGHT, START, GOAL, obstacles)
-            
-            # entrenamiento
-            train_time = model_ql.walle.train()
-            
-            # ejecución
-            ql_success, ql_steps = model_ql.walle.run_policy()
-            
-            results.append({
-                "mapID": i,
-                "densidad": density,
-                "algoritmo": "Q-Learn",
-                "exito": ql_success,
-                "pasos": ql_steps,
-                "tiempo": round(train_time, 5)
-            })
-            print(f"{density:<10} | {'Q-Learn':<10} | {str(ql_success):<6} | {ql_steps:<6} | {train_time:.5f}")
-
-    # guardar en csv
-    csv_file = "resultados_experimento.csv"
-    keys = results[0].keys()
+    for i, density, width, height, start, goal, obstacles in maps:
+        # prueba A* (se consulta la cache antes de buscar)
+        astar_stats = {} if profiler.enabled else None
+        astar_cached, path = False, None
+        if use_cache:
+            key = cache.scenario_key(width, height, start, goal, obstacles, "astar")
+            astar_cached, path = cache.get_path(key)
+        # solo se mide la búsqueda, no el hash del mapa
+        t0 = time.time()
+        if not astar_cached:
+            path = astar_search(start, goal, obstacles, width, height, astar_stats)
+        t1 = time.time()
+        if use_cache and not astar_cached:
+            cache.put_path(key, path)
+        
+        astar_time = t1 - t0
+        astar_success = path is not None
+        # se resta 1 porque el path incluye el start
+        astar_steps = (len(path) - 1) if path else 0 
+        
+        row = {
+            "mapID": i,
+            "densidad": density,
+            "algoritmo": "A*",
+            "exito": astar_success,
+            "pasos": astar_steps,
+            "tiempo": "" if astar_cached else round(astar_time, 5),
+            "cache": astar_cached
+        }
+        if profiler.enabled:
+            # nodos/s sale de la corrida sin trazar; memoria de una pasada aparte
+            astar_stats["nodos_seg"] = round(astar_stats["expandidos"] / astar_time) if astar_time > 0 else ""
+            astar_stats.update(profiler.profile_pass("A*", f"A*_{density}", lambda: astar_search(
+                start, goal, obstacles, width, height)))
+            row.update(astar_stats)
+        results.append(row)
+        print(f"{density:<10} | {'A*':<10} | {str(astar_success):<6} | {astar_steps:<6} | {astar_time:.5f}")
+
+        # pureba Q-Learning
+        ql_stats = {} if profiler.enabled else None
+        # con perfil se guarda el estado de random para repetir el mismo entrenamiento
+        rng_state = random.getstate() if profiler.enabled else None
+        # se instancia el modelo nuevo (se mide aparte para ver el costo de Mesa)
+        t0 = time.perf_counter()
+        model_ql = GridWorldQL(width, height, start, goal, obstacles)
+        t_model = time.perf_counter() - t0
+
+        # entrenamiento
+        train_time = model_ql.walle.train(ql_stats, use_cache)
+
+        # ejecución
+        ql_success, ql_steps = model_ql.walle.run_policy()
+
+        row = {
+            "mapID": i,
+            "densidad": density,
+            "algoritmo": "Q-Learn",
+            "exito": ql_success,
+            "pasos": ql_steps,
+            "tiempo": "" if model_ql.walle.from_cache else round(train_time, 5),
+            "cache": model_ql.walle.from_cache
+        }
+        if profiler.enabled:
+            ql_stats["t_modelo"] = round(t_model, 5)
+            rng_after = random.getstate()
+
+            def ql_pass():
+                random.setstate(rng_state)
+                m = GridWorldQL(width, height, start, goal, obstacles)
+                m.walle.train(use_cache=False)
+                m.walle.run_policy()
+                return m
+
+            ql_stats.update(profiler.profile_pass("Q-Learn", f"Q-Learn_{density}", ql_pass))
+            # se continúa con la secuencia que dejó la corrida medida
+            random.setstate(rng_after)
+            row.update(ql_stats)
+        results.append(row)
+        print(f"{density:<10} | {'Q-Learn':<10} | {str(ql_success):<6} | {ql_steps:<6} | {train_time:.5f}")
+
+    # guardar en csv (con perfil, A* y Q-Learn tienen columnas distintas)
+    keys = {}
+    for row in results:
+        keys.update(dict.fromkeys(row))
     with open(csv_file, 'w', newline='') as f:
-        dict_writer = csv.DictWriter(f, keys)
+        dict_writer = csv.DictWriter(f, list(keys), restval="")
         dict_writer.writeheader()
         dict_writer.writerows(results)
+
+    prof_files = profiler.dump()
     
     print("------------------------------------------------------------")
     print(f"experimento finalizado. los resultados se guardaron en '{csv_file}'")
+    if prof_files:
+        print(f"perfiles cProfile guardados en '{cprofile_dir}' ({len(prof_files)} archivos)")
 
 if __name__ == "__main__":
-    run_experiment()
\ No newline at end of file
+    # uso: python experimento.py [--perfil] [--cprofile DIR] [archivo.scen|archivo.jsonl] [límite]
+    parser = argparse.ArgumentParser(description="experimento A* vs Q-Learning")
+    parser.add_argument("escenarios", nargs="?", help="archivo .scen o .jsonl (por defecto mapas aleatorios)")
+    parser.add_argument("limite", nargs="?", type=int, help="máximo de escenarios a leer")
+    parser.add_argument("--perfil", action="store_true", help="agrega columnas de memoria y contadores al csv")
+    parser.add_argument("--cprofile", metavar="DIR", help="guarda un .prof por algoritmo y densidad en DIR")
+    parser.add_argument("--sin-cache", action="store_true", help="recalcula todo sin consultar la cache")
+    args = parser.parse_args()
+
+    scenarios = iter_scenarios(args.escenarios, limit=args.limite) if args.escenarios else None
+    run_experiment(scenarios, profile=args.perfil, cprofile_dir=args.cprofile,
+                   use_cache=not args.sin_cache)
@@ -0,0 +1,77 @@
+import cProfile
+import os
+import sys
+import tracemalloc
+
+# modo perfil para experimento.py: memoria pico (tracemalloc), bloques vivos
+# y volcado opcional de cProfile por clase de escenario.
+# la medición se hace en una pasada aparte, así los tiempos del csv salen
+# de una corrida sin tracemalloc ni cProfile. apagado no se ejecuta nada.
+
+
+class Profiler:
+    def __init__(self, enabled=False, cprofile_dir=None):
+        self.enabled = enabled or cprofile_dir is not None
+        self.cprofile_dir = cprofile_dir
+        self.profiles = {}  # clase de escenario -> cProfile.Profile
+        self.warmed = set()  # algoritmos que ya tuvieron su pasada de calentamiento
+
+    def profile_pass(self, algorithm, group, fn):
+        """Repite `fn()` bajo tracemalloc (y cProfile) y retorna sus contadores.
+
+        La primera vez por algoritmo se corre `fn()` una vez sin medir para
+        que imports y cachés internas no se le carguen al primer escenario.
+        `fn` debe repetir la corrida medida (mismo estado de random) para
+        que los contadores describan la misma ejecución.
+        `bloques_netos` son los bloques que siguen vivos al final, no el
+        total de asignaciones.
+        """
+        if not self.enabled:
+            return {}
+        if algorithm not in self.warmed:
+            fn()
+            self.warmed.add(algorithm)
+
+        prof = None
+        if self.cprofile_dir is not None:
+            prof = self.profiles.get(group)
+            if prof is None:
+                prof = self.profiles[group] = cProfile.Profile()
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        mem0 = tracemalloc.get_traced_memory()[0]
+        blocks0 = sys.getallocatedblocks()
+        if prof is not None:
+            prof.enable()
+        try:
+            result = fn()
+        finally:
+            if prof is not None:
+                prof.disable()
+            peak = tracemalloc.get_traced_memory()[1]
+            # bloques que siguen vivos al terminar (lo que retiene el resultado),
+            # no el total de asignaciones hechas durante la pasada
+            blocks = sys.getallocatedblocks() - blocks0
+            if started:
+                tracemalloc.stop()
+        del result
+        return {
+            "mem_pico_kb": round((peak - mem0) / 1024, 1),
+            "bloques_netos": blocks,
+        }
+
+    def dump(self):
+        """Escribe un .prof por clase de escenario y retorna las rutas."""
+        if not self.profiles:
+            return []
+        os.makedirs(self.cprofile_dir, exist_ok=True)
+        files = []
+        for group, prof in self.profiles.items():
+            name = "".join(c if c.isalnum() or c in "-." else "_" for c in str(group))
+            path = os.path.join(self.cprofile_dir, f"perfil_{name}.prof")
+            prof.dump_stats(path)
+            files.append(path)
+        return files
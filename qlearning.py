@@ -5,6 +5,7 @@ import time
 from mesa import Agent, Model
 from mesa.space import MultiGrid
 from mesa.time import BaseScheduler
+import cache
 
 ACTIONS = [0, 1, 2, 3]  # arriba, abajo, izquierda, derecha
 ACTION_MOVES = {0: (0, 1), 1: (0, -1), 2: (-1, 0), 3: (1, 0)} # (dx, dy)
@@ -44,6 +45,21 @@ class WalleQLearner(Agent):
 
     def train(self):
         """Ejecuta el ciclo completo de entrenamiento (Episodios)"""
+        m = self.model
+        key = None
+        cached = None
+        if cache.ENABLED:
+            key = cache.scenario_key(m.width, m.height, self.start_pos, self.goal_pos,
+                                     m.blocked, cache.ql_params_key(QL_Params, "qlearning"))
+            cached = cache.get_q_table(key)
+        if cached is not None:
+            # mismo mapa y parámetros: se reutiliza la Q-table ya entrenada
+            self.q_table = cached
+            self.policy_ready = True
+            print("Q-Table recuperada de la cache.")
+            self.save_q_table()
+            return
+
         print(f"Iniciando entrenamiento ({QL_Params.EPISODES} episodios)...")
         
         for episode in range(QL_Params.EPISODES):
@@ -92,6 +108,7 @@ class WalleQLearner(Agent):
         
         self.policy_ready = True
         print("Entrenamiento finalizado.")
+        cache.put_q_table(key, self.q_table)
         self.save_q_table()
 
     def step(self):